@@ -3,20 +3,28 @@ import sys
 import os
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from collections import namedtuple
-from ete3 import Tree, NCBITaxa
+from array import array
 from scgid.module import Module
 from scgid.modcomm import LoggingEntity, Head, get_head, ErrorHandler
 from scgid.reuse import ReusableOutput, ReusableOutputManager, augustus_predict, nucleotide_blast, protein_blast
 from scgid.dependencies import CaseDependency
 from scgid.parsers import PathStore, StoreInt
-from scgid.sequence import DNASequenceCollection, DNASequence, revcomp, complement
+from scgid.sequence import DNASequenceCollection, DNASequence, MappedFasta, revcomp, complement
 from scgid.library import subprocessP
 from scgid.infotable import InfoTable, get_by_idx, count_unique
 from scgid.error import ModuleError, ArgumentError, Ok, check_result
 
+# numba is optional - the codon-counting kernel below runs as plain python
+# when it isn't installed
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
 
 class SmallTreeError(ModuleError):
 
@@ -35,6 +43,118 @@ class NoGoodCladesError(ModuleError):
         if error_catch:
             self.catch()
 
+# Compiled once at module scope - pulling the compiled pattern out of the
+# per-line parsing loop avoids the re-cache lookup on every CDS line
+PID_PATTERN = re.compile(rb"[.](g[0-9]+)[.]")
+
+# ASCII base -> 2-bit code (A=0, C=1, G=2, T/U=3) in either case; any
+# other byte (N, degenerates) maps to 255 and invalidates its codon
+CODON_BASE_CODES = np.full(256, 255, dtype=np.uint8)
+for _i, _b in enumerate(b"ACGT"):
+    CODON_BASE_CODES[_b] = _i
+    CODON_BASE_CODES[_b + 32] = _i
+CODON_BASE_CODES[ord('U')] = CODON_BASE_CODES[ord('u')] = 3
+
+# RNA codon labels ordered by their 6-bit code (a << 4 | b << 2 | c), so
+# kernel count slots line up with the codon_counts Series keys
+CODON_LABELS = [a + b + c for a in "ACGU" for b in "ACGU" for c in "ACGU"]
+
+
+def _count_codons_kernel(codes, counts):
+    n = codes.shape[0] - codes.shape[0] % 3
+    for i in range(0, n, 3):
+        a = codes[i]
+        b = codes[i + 1]
+        c = codes[i + 2]
+        # Branchless validity: any non-ACGT base sets a high bit in the
+        # OR, zeroing the increment; the mask keeps the slot in range
+        m = ((a | b | c) >> 2) == 0
+        counts[((a << 4) | (b << 2) | c) & 63] += m
+
+
+def _count_codons_batch_kernel(codes, offsets, counts):
+    # One flat buffer of base codes for every concatenate, sequence s
+    # spanning codes[offsets[s]:offsets[s + 1]] - lets numba parallelize
+    # across sequences with one compiled kernel launch
+    for s in prange(offsets.shape[0] - 1):
+        lo = offsets[s]
+        hi = offsets[s + 1]
+        n = hi - (hi - lo) % 3
+        for i in range(lo, n, 3):
+            a = codes[i]
+            b = codes[i + 1]
+            c = codes[i + 2]
+            # Branchless validity, as in _count_codons_kernel
+            m = ((a | b | c) >> 2) == 0
+            counts[s, ((a << 4) | (b << 2) | c) & 63] += m
+
+
+# cache=True persists the compiled kernels in __pycache__, so the JIT
+# cost is paid once per machine instead of once per scgid run
+if njit is not None:
+    _count_codons_kernel = njit(cache=True)(_count_codons_kernel)
+    _count_codons_batch_kernel = njit(parallel=True, cache=True)(_count_codons_batch_kernel)
+
+
+def _count_codons_worker(buf):
+    codes = CODON_BASE_CODES[np.frombuffer(buf, dtype=np.uint8)]
+
+    if njit is not None:
+        counts = np.zeros(64, dtype=np.int64)
+        _count_codons_kernel(codes, counts)
+        return counts
+
+    # Interpreted fallback: build the 6-bit codon ids for the whole
+    # buffer at once and histogram them with bincount - every loop runs
+    # in C instead of stepping codon-by-codon in python
+    n = codes.shape[0] - codes.shape[0] % 3
+    codons = codes[:n].reshape(-1, 3).astype(np.int64)
+    valid = (codons < 4).all(axis=1)
+    ids = (codons[:, 0] << 4) | (codons[:, 1] << 2) | codons[:, 2]
+    return np.bincount(ids[valid], minlength=64)
+
+
+def count_codons_batch(cds_concatenates, cpus=1):
+    seqs = list(cds_concatenates.seqs())
+
+    if njit is not None:
+        # One flat buffer, one parallel kernel launch - numba threads
+        # over sequences, so no process pool is needed
+        offsets = np.zeros(len(seqs) + 1, dtype=np.int64)
+        for s, seq in enumerate(seqs):
+            offsets[s + 1] = offsets[s] + seq.length
+
+        codes = np.empty(offsets[-1], dtype=np.uint8)
+        for s, seq in enumerate(seqs):
+            buf = seq.string.encode() if isinstance(seq.string, str) else bytes(seq.string)
+            codes[offsets[s]:offsets[s + 1]] = CODON_BASE_CODES[
+                np.frombuffer(buf, dtype=np.uint8)]
+
+        counts = np.zeros((len(seqs), 64), dtype=np.int64)
+        _count_codons_batch_kernel(codes, offsets, counts)
+
+    else:
+        bufs = [seq.string.encode() if isinstance(seq.string, str) else bytes(seq.string)
+                for seq in seqs]
+
+        if cpus > 1 and len(bufs) > 1:
+            # Interpreted counting is CPU-bound on a per-contig loop, so
+            # fan contigs out across worker processes - each sends back a
+            # 64-slot count array
+            with ProcessPoolExecutor(max_workers=cpus) as pool:
+                counts = list(pool.map(
+                    _count_codons_worker, bufs,
+                    chunksize=max(1, len(bufs) // (cpus * 4))))
+        else:
+            counts = [_count_codons_worker(buf) for buf in bufs]
+
+    logrows = []
+    for seq, row in zip(seqs, counts):
+        seq.codon_counts[CODON_LABELS] = row
+        logrows.append(seq.codon_logrow())
+
+    return logrows
+
 SYNONYMOUS_CODONS = {
     'Phe': ['UUU', 'UUC'],
     'Leu': ['UUA', 'UUG', 'CUU', 'CUC', 'CUA', 'CUG'],
@@ -106,17 +226,24 @@ class CDSConcatenate(DNASequence):
         )
 
     def split_codons(self):
-        self.transcomp = complement(self.transcribe())
+        transcript = self.transcribe()
+        if isinstance(transcript, (bytes, bytearray)):
+            transcript = transcript.decode()
+        self.transcomp = complement(transcript)
         return [self.transcomp[i:i + 3] for i in range(0, self.length, 3)]
 
     def count_codons(self):
-        for codon in self.split_codons():
-            if 'N' in codon:
-                continue
-            self.codon_counts[codon] += 1
-        logrow = "[{:<10}] ".format(
+        # Count straight off the DNA buffer - T and U share a base code, so
+        # the counts land in the right RNA-labelled bins without running the
+        # old transcribe/complement round-trip first. Codons touching any
+        # non-ACGT base (N, degenerates) are skipped, as before.
+        buf = self.string.encode() if isinstance(self.string, str) else bytes(self.string)
+        self.codon_counts[CODON_LABELS] = _count_codons_worker(buf)
+        return self.codon_logrow()
+
+    def codon_logrow(self):
+        return "[{:<10}] ".format(
             self.header) + " ".join(["{:<5}".format(x) for x in self.codon_counts.to_list()])
-        return logrow
 
     def calculate_rscu(self):
         for _, codons in SYNONYMOUS_CODONS.items():
@@ -135,6 +262,11 @@ class CDSConcatenate(DNASequence):
 class RSCUTree(object):
 
     def __init__(self, treepath, head=None):
+        # Deferred import - ete3 drags in a large dependency tree and is
+        # only needed once a tree has actually been built, so keeping it
+        # out of module scope shortens CLI startup (same pattern as kmers)
+        from ete3 import Tree
+
         self.dendrogram = Tree(treepath)
 
         if head is None:
@@ -477,94 +609,123 @@ class Codons(Module, LoggingEntity, Head, ErrorHandler):
 
         return parser
 
-    def locate_cds_gff3(self, gff3_path, pid_pattern = "[.](g[0-9]+)[.]"):
-
-        contig_chunks = {}
-
-        with open(gff3_path, 'r') as gff3:
-
-            CDSChunk = namedtuple("CDSChunk", ["start", "end", "strand"])
-            for line in gff3:
-                # Skip comment lines
-                if line[0] == "#":
-                    continue
-
-                spl = line.split('\t')
-                if len(spl) < 6:
-                    continue
-
-                # Ignore all but CDS lines in gff3
-                if spl[2] == "CDS":
-
-                    shortname = '_'.join(spl[0].split('_')[0:2])
-
-                    # Capture pid
-                    s = re.search(pid_pattern, spl[8])
-                    pid = s.group(1)
-
-                    # Group CDS lines in gff3 by parent contig (by shortname)
-                    # and protein (by pid)
-                    if shortname in contig_chunks:
-                        if pid in contig_chunks[shortname]:
-                            contig_chunks[shortname][pid].append(
-                                CDSChunk(spl[3], spl[4], spl[6]))
-                        else:
-                            contig_chunks[shortname][pid] = [
-                                CDSChunk(spl[3], spl[4], spl[6])]
-                    else:
-                        contig_chunks[shortname] = {
-                            pid: [CDSChunk(spl[3], spl[4], spl[6])]
-                        }
-        return contig_chunks
-
     # Investigate inclusion of STOP codons in CDS here later - see how the
     # trees look first excluding them?
-    def concatenate_cds(self, contig_chunks, nucl):
-        cds_concatenates = {}
-
-        # Iterate through CDS chunks of predicted proteins on each contig and
-        # pull CDS sequences from nucleotide fasta
-        for shortname, pids in contig_chunks.items():
-
-            contig_cds_cat = str()
+    def extract_cds_concatenates(self, gff3_path, nucl, pid_pattern = PID_PATTERN):
 
-            for _, chunks in pids.items():
+        gene_chunks = {}
 
-                gene_cds = str()
+        # Read the whole gff3 as bytes in one go so that per-line parsing
+        # skips unicode decoding and buffered readline overhead - only the
+        # small shortname/pid fields get decoded
+        with open(gff3_path, 'rb', buffering=1 << 20) as gff3:
+            data = gff3.read()
 
-                for chunk in chunks:
-
-                    # Ignore zero-length CDS chunks
-                    if chunk.start == chunk.end:
-                        continue
+        for line in data.split(b'\n'):
+            # Skip comment lines
+            if line.startswith(b"#"):
+                continue
 
-                    # Fetch CDS sequence from contig by start/stop indices
-                    # listed in gff3 and revcomp if on reverse strand
-                    if chunk.strand == '-':
-                        chunk_string = revcomp(nucl.index[shortname].string[
-                            int(chunk.start) - 1: int(chunk.end)
-                        ])
-                    else:  # i.e., chunk.strand == '+'
-                        chunk_string = nucl.index[shortname].string[
-                            int(chunk.start) - 1: int(chunk.end)
-                        ]
+            # Cap the split at 9 fields so the column-9 attribute text
+            # is never split needlessly
+            spl = line.split(b'\t', 8)
+            if len(spl) < 9:
+                continue
 
-                    # Combine chunk sequences for each gene
-                    gene_cds += chunk_string
+            # Ignore all but CDS lines in gff3
+            if spl[2] == b"CDS":
+
+                # Shortname is everything up to the second underscore -
+                # find it directly rather than split/slice/join, which
+                # allocates a throwaway list and fragments per line
+                seqid = spl[0]
+                u = seqid.find(b'_')
+                if u != -1:
+                    u = seqid.find(b'_', u + 1)
+                shortname = (seqid if u == -1 else seqid[:u]).decode()
+
+                # Capture pid with a plain substring scan - the pattern is
+                # trivial (`.gNNN.`) so hunting for the delimiters directly
+                # skips the regex engine on every CDS line
+                attr = spl[8]
+                i = attr.find(b".g")
+                j = attr.find(b".", i + 2)
+                if i == -1 or j == -1 or not attr[i + 2:j].isdigit():
+                    # Fall back to the regex for attribute fields that
+                    # don't look like Augustus output
+                    pid = pid_pattern.search(attr).group(1).decode()
+                else:
+                    pid = attr[i + 1:j].decode()
+
+                # Group CDS lines in gff3 by gene, keyed flat on
+                # (shortname, pid) - one dict lookup per line instead of
+                # two through a dict-of-dicts. Chunks are stored as three
+                # parallel arrays (structure-of-arrays) instead of a list
+                # of per-chunk objects - three scalar appends per row and
+                # no boxing
+                key = (shortname, pid)
+                try:
+                    starts, ends, strands, gene_len = gene_chunks[key]
+                except KeyError:
+                    starts = array('i')
+                    ends = array('i')
+                    strands = bytearray()
+                    gene_len = array('q', [0])
+                    gene_chunks[key] = (starts, ends, strands, gene_len)
+
+                # Coordinates are parsed, and zero-length chunks dropped,
+                # right here - the gather loop below never has to look at
+                # a chunk twice
+                start = int(spl[3])
+                end = int(spl[4])
+                if start == end:
+                    continue
 
-                # Toss out predicted CDS if they aren't divisible by 3 to avoid introducing frameshifts into CDS concatenate
-                # Combine gene_cds into contig_cds_cat beacuse they occur on
-                # the same contig
-                if len(gene_cds) % 3 == 0:
-                    contig_cds_cat += gene_cds
+                starts.append(start)
+                ends.append(end)
+                strands.append(spl[6][0])
+
+                # Keep the gene's running CDS length current as chunks
+                # arrive, so the frame check below doesn't re-walk the
+                # coordinate arrays
+                gene_len[0] += end - start + 1
+
+        # Gather straight off the coordinate arrays - fusing the gather
+        # with the parse above keeps the per-contig chunk table from ever
+        # being handed around as an intermediate result. Chunk strings are
+        # collected per contig and joined once at the end - repeated
+        # string += makes an O(n) copy per append on long contigs
+        contig_parts = {}
+
+        for (shortname, _), (starts, ends, strands, gene_len) in gene_chunks.items():
+
+            # The in-frame decision comes straight from the length kept at
+            # append time - no sequence data touched. Genes whose CDS
+            # aren't divisible by 3 are tossed out to avoid introducing
+            # frameshifts into the CDS concatenate
+            if gene_len[0] == 0 or gene_len[0] % 3 != 0:
+                continue
 
-            # Store contig_cds_cat in DNASequence object and add to dict
-            if len(contig_cds_cat) != 0:
-                cds_concatenates[shortname] = CDSConcatenate(
-                    shortname, contig_cds_cat)
+            # Gather the surviving gene's chunks straight into the
+            # contig-level part list - revcomp on reverse strand
+            cds_parts = contig_parts.setdefault(shortname, [])
+            for start, end, strand in zip(starts, ends, strands):
+                chunk_string = nucl.fetch(shortname, start - 1, end)
+                if strand == ord('-'):
+                    chunk_string = revcomp(chunk_string)
+                cds_parts.append(chunk_string)
+
+        # Store each contig's concatenate in a DNASequence object and
+        # return them all as a DNASequenceCollection. dict.fromkeys sizes
+        # the hash table for every contig in one shot, so filling it never
+        # triggers an incremental rehash; every contig_parts entry holds
+        # at least one chunk because genes only land there after passing
+        # the frame mask
+        cds_concatenates = dict.fromkeys(contig_parts)
+        for shortname, cds_parts in contig_parts.items():
+            cds_concatenates[shortname] = CDSConcatenate(
+                shortname, b''.join(cds_parts))
 
-        # Return all contig-level CDS concatenates as a DNASequenceCollection
-        # object
         return DNASequenceCollection().from_dict(cds_concatenates)
 
     # Function that confirms size of CDSConcatenate DNASequenceCollection is
@@ -691,25 +852,19 @@ class Codons(Module, LoggingEntity, Head, ErrorHandler):
 
         self.logger.info(f"Running in {self.config.get('mode')} mode.")
 
-        # Read in nucleotide FASTA
-        nucl = DNASequenceCollection().from_fasta(self.config.get("nucl"))
-        self.logger.info(f"Read nucleotide FASTA at `{self.config.get('nucl')}` into memory.")
-
-        # Rekey nucl by shortname
-        nucl.rekey_by_shortname()
+        # Index the nucleotide FASTA through mmap - CDS extraction only
+        # needs subsequence fetches, so the assembly stays on disk instead
+        # of being read into memory up front
+        nucl = MappedFasta(self.config.get("nucl"))
+        self.logger.info(f"Indexed nucleotide FASTA at `{self.config.get('nucl')}`.")
 
         ####################################
         #'''
-        # Get coordinates and strand of CDS chunks
-        self.logger.info(f"Pulling locations of CDS chunks from gff3 at `{self.config.get('gff3')}`")
-        cds_coords = self.locate_cds_gff3(
-            self.config.get("gff3")
-        )
-
-        # Concatenate all CDS sequences on each contig
-        self.logger.info(f"Concatenating CDS chunks from each contig")
-        cds_concatenates = self.concatenate_cds(
-            cds_coords,
+        # Parse CDS locations out of the gff3 and concatenate their
+        # sequences per contig in a single pass
+        self.logger.info(f"Extracting and concatenating CDS chunks from gff3 at `{self.config.get('gff3')}`")
+        cds_concatenates = self.extract_cds_concatenates(
+            self.config.get("gff3"),
             nucl
         )
 
@@ -720,10 +875,10 @@ class Codons(Module, LoggingEntity, Head, ErrorHandler):
         # Write CDS concatenates of sufficient length to fasta
         cds_concatenates.write_fasta(f"cds_concatenates_larger_than{self.config.get('minlen')}bp.fasta")
 
-        # Count codons on each CDS concatenate
+        # Count codons on each CDS concatenate in one batched kernel call
         self.logger.info(f"Counting codon occurences on each CDS concatenate")
-        for c in cds_concatenates.seqs():
-            self.simplelogger.info(c.count_codons())
+        for logrow in count_codons_batch(cds_concatenates, cpus=int(self.config.get("cpus"))):
+            self.simplelogger.info(logrow)
 
         if not self.config.get("allow_stop_codons"):
             # Remove CDS concatenates that contain STOP codons, becaause they
@@ -798,7 +953,10 @@ class Codons(Module, LoggingEntity, Head, ErrorHandler):
         nj_tree.pick_clade()
 
         # Return filtered DNASequenceCollection with non-trainset contigs
-        # excluded
+        # excluded - tree tips carry shortnames, which resolve through the
+        # mmap offset index directly, so only the selected records are
+        # ever copied out of the map and no rekeyed in-memory copy of the
+        # assembly is made
         trainset = nucl.header_list_filter(nj_tree.best_clade.get_leaf_names())
 
         # Write trainset to FASTA
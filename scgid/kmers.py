@@ -30,7 +30,6 @@ else:
     import numpy as np
     import pandas as pd
     from collections import namedtuple
-    from ete3 import NCBITaxa
     from scgid.module import Module
     from scgid.error import ModuleError, Ok
     from scgid.library import file_grep, subprocessP, subprocessC, random_colors
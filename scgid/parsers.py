@@ -5,7 +5,6 @@ import os
 import re
 import warnings
 from collections import namedtuple, OrderedDict
-from ete3 import NCBITaxa
 from scgid.error import ModuleError, ErrorClassNotImplemented, Ok, check_result
 import scgid.pkg_settings as pkg_settings
 from scgid.modcomm import get_head, logger_name_gen, LoggingEntity, ErrorHandler
@@ -183,6 +182,12 @@ class BlastoutParser(LoggingEntity, ErrorHandler):
         return ret
 
     def ncbi_taxrpt (self, taxids):
+            # Deferred import - ete3 is only needed when lineages are
+            # actually pulled from the ncbi taxonomy database, and a
+            # module-level import here would put the full ete3 chain back
+            # on every CLI startup (same pattern as kmers)
+            from ete3 import NCBITaxa
+
             self.logger.info("Using taxids from blastout to pull lineage information from ncbi taxonomy database...")
             ncbi = NCBITaxa()
             ids = {}
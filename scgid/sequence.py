@@ -1,4 +1,5 @@
 import sys
+import mmap
 import numpy
 import re
 import numpy as np
@@ -8,6 +9,32 @@ from scgid.error import ErrorClassNotImplemented
 SPADES_HEADER_PATTERN = re.compile("NODE_[0-9]+_length_[0-9]+_cov_[0-9.]+")
 IUPAC_DEGENERATES = ['R', 'Y', 'S', 'W', 'K', 'M', 'B', 'D', 'H', 'V']
 
+# 256-entry translation table for revcomp - complements ACGTN in either
+# case and converts IUPAC degenerate bases to N, so the whole sequence can
+# be complemented with one bytes.translate call instead of a per-base loop
+REVCOMP_TABLE = bytearray(range(256))
+for _src, _dst in zip(b"ACGTNacgtn", b"TGCANTGCAN"):
+    REVCOMP_TABLE[_src] = _dst
+for _degen in IUPAC_DEGENERATES:
+    REVCOMP_TABLE[ord(_degen)] = ord('N')
+    REVCOMP_TABLE[ord(_degen.lower())] = ord('N')
+REVCOMP_TABLE = bytes(REVCOMP_TABLE)
+
+# Companion table for transcription (A->U, T->A, G->C, C->G), built the
+# same way as REVCOMP_TABLE
+TRANSCRIBE_TABLE = bytearray(range(256))
+for _src, _dst in zip(b"ATGCNatgcn", b"UACGNUACGN"):
+    TRANSCRIBE_TABLE[_src] = _dst
+for _degen in IUPAC_DEGENERATES:
+    TRANSCRIBE_TABLE[ord(_degen)] = ord('N')
+    TRANSCRIBE_TABLE[ord(_degen.lower())] = ord('N')
+TRANSCRIBE_TABLE = bytes(TRANSCRIBE_TABLE)
+
+NONDEGENERATE_BASES = b"ACGTNacgtn"
+VALID_BASES = NONDEGENERATE_BASES + \
+    ''.join(IUPAC_DEGENERATES).encode() + \
+    ''.join(IUPAC_DEGENERATES).lower().encode()
+
 def reverse(string):
     chars = ["x"] * len(string)
     pos = len(string) - 1
@@ -44,27 +71,22 @@ def complement(string):
 
 
 def revcomp(string):
-    convert = {
-        'A': 'T',
-        'T': 'A',
-        'G': 'C',
-        'C': 'G',
-        'N': 'N'
-    }
-    comp = []
-    for l in string:
-        l = l.upper()
-        try:
-            comp.append(convert[l])
-        except KeyError:
-            if l in IUPAC_DEGENERATES:
-                print(f"WARNING: Degenerate base designation '{l}' converted to 'N'")
-                comp.append("N")
-            else:
-                raise IOError(f"Sequence string contains illegal character: '{l}'")
-    revcomp = comp[::-1]
+    as_str = isinstance(string, str)
+    data = string.encode() if as_str else bytes(string)
+
+    # Validate in bulk - deleting every legal base leaves only offenders
+    illegal = data.translate(None, VALID_BASES)
+    if illegal:
+        raise IOError(f"Sequence string contains illegal character: '{chr(illegal[0]).upper()}'")
+
+    degenerate = data.translate(None, NONDEGENERATE_BASES)
+    for d in sorted(set(degenerate)):
+        print(f"WARNING: Degenerate base designation '{chr(d).upper()}' converted to 'N'")
 
-    return ''.join(revcomp)
+    # Complement the whole buffer in one C-level pass, then reverse
+    out = data.translate(REVCOMP_TABLE)[::-1]
+
+    return out.decode() if as_str else out
 
 '''Deprecated I think
 class DnaSequence(object):
@@ -326,7 +348,163 @@ class DNASequenceCollection(object):
                 o.write(f"{s.to_fasta()}\n")
 
 
+class MappedFastaRecord(object):
+
+    __slots__ = ["header", "shortname", "seq_start", "seq_end",
+                 "length", "linebases", "linewidth", "uniform"]
+
+    def __init__(self, header, shortname, seq_start):
+        self.header = header
+        self.shortname = shortname
+        self.seq_start = seq_start
+        self.seq_end = seq_start
+        self.length = 0
+        self.linebases = 0
+        self.linewidth = 0
+        self.uniform = True
+
+
+class MappedFasta(object):
+    """
+    Read-only FASTA access backed by mmap. The file is scanned once for
+    record byte offsets and line geometry, then subsequence fetches are
+    served by slicing the map directly, so the assembly never has to be
+    held in memory as python strings. Records are reachable by full
+    header or by shortname.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, 'rb')
+        self._fh.seek(0, 2)
+        if self._fh.tell() == 0:
+            # mmap refuses empty files - leave an empty index instead of
+            # tracebacking on an empty --nucl
+            self.mm = b''
+        else:
+            self.mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = OrderedDict()
+        self.shortnames = {}
+        self._scan()
+
+    def _scan(self):
+        mm = self.mm
+        size = len(mm)
+        pos = 0
+        record = None
+        short_line_seen = False
+
+        while pos < size:
+            nl = mm.find(b'\n', pos)
+            if nl == -1:
+                nl = size
+            line_end = nl
+            if line_end > pos and mm[line_end - 1] == 0x0D:
+                line_end -= 1
+
+            if mm[pos:pos + 1] == b'>':
+                header = mm[pos + 1:line_end].decode()
+                if header in self.index:
+                    raise KeyError("FASTA has duplicated headers")
+                shortname = "_".join(header.split("_")[0:2])
+                record = MappedFastaRecord(header, shortname, nl + 1)
+                self.index[header] = record
+                self.shortnames[shortname] = header
+                short_line_seen = False
+
+            elif record is not None:
+                linebases = line_end - pos
+
+                if linebases == 0:
+                    # A blank line inside a sequence block contributes no
+                    # bases but shifts the byte offset of every later
+                    # line, so it disqualifies offset arithmetic just
+                    # like an interior short line
+                    if record.linebases > 0:
+                        short_line_seen = True
+                else:
+                    if record.linebases == 0:
+                        record.linebases = linebases
+                        record.linewidth = nl + 1 - pos
+                        # Anchor offsets at the first sequence line in
+                        # case blank lines follow the header
+                        record.seq_start = pos
+                    # Fetch arithmetic only holds while full-width lines
+                    # are uniform, with at most a short final line
+                    elif short_line_seen or linebases > record.linebases:
+                        record.uniform = False
+
+                    if linebases < record.linebases:
+                        short_line_seen = True
+
+                    record.length += linebases
+                    record.seq_end = nl
+
+            pos = nl + 1
+
+    def _record(self, name):
+        if name in self.index:
+            return self.index[name]
+        return self.index[self.shortnames[name]]
+
+    def headers(self):
+        return self.index.keys()
+
+    def __contains__(self, name):
+        return name in self.index or name in self.shortnames
+
+    def get(self, name):
+        record = self._record(name)
+        return self.mm[record.seq_start:record.seq_end].translate(None, b'\r\n')
+
+    def fetch(self, name, start, end):
+        """
+        Return bases [start:end) of a record as bytes, slicing the map by
+        computed byte offsets when line lengths are uniform and falling
+        back to materializing the record when they aren't.
+        """
+        record = self._record(name)
+        if end > record.length:
+            end = record.length
+        if start < 0:
+            start = 0
+        if start >= end:
+            return b''
+
+        if not record.uniform:
+            return self.get(name)[start:end]
+
+        lo = record.seq_start + \
+            (start // record.linebases) * record.linewidth + \
+            start % record.linebases
+        last = end - 1
+        hi = record.seq_start + \
+            (last // record.linebases) * record.linewidth + \
+            last % record.linebases + 1
+
+        return self.mm[lo:hi].translate(None, b'\r\n')
+
+    def header_list_filter(self, header_list):
+        """
+        Mirror DNASequenceCollection.header_list_filter, but materialize
+        only the requested records out of the map. Names may be full
+        headers or shortnames - both resolve through the offset index
+        built at scan time, so no rekeyed copy of the whole assembly is
+        ever made.
+        """
+        seq_dict = dict()
+        for name in sorted(header_list):
+            record = self._record(name)
+            seq_dict[name] = DNASequence(record.header, self.get(name))
+        return DNASequenceCollection().from_dict(seq_dict)
+
+
 class DNASequence(object):
+    """
+    One DNA sequence. `string` may be str or bytes - the CDS extraction
+    path keeps sequence data as bytes end-to-end, while FASTA readers
+    still hand in str.
+    """
 
     def __init__(self, header, string, spades=False, coverage=np.nan):
         self.header = header
@@ -357,14 +535,17 @@ class DNASequence(object):
         else:
             self.coverage = coverage
 
-        self.gc = float()
-        self.gcCount = 0
-        for letter in self.string:
-            if letter.upper() == "G" or letter.upper() == "C":
-                self.gcCount += 1
+        if isinstance(self.string, (bytes, bytearray)):
+            upper = bytes(self.string).upper()
+            self.gcCount = upper.count(b"G") + upper.count(b"C")
+        else:
+            upper = self.string.upper()
+            self.gcCount = upper.count("G") + upper.count("C")
         self.gc = np.divide(self.gcCount, self.length)
 
     def to_fasta(self):
+        if isinstance(self.string, (bytes, bytearray)):
+            return f">{self.header}\n{self.string.decode()}"
         return f">{self.header}\n{self.string}"
 
     def revcomp(self, inplace=False):
@@ -374,27 +555,20 @@ class DNASequence(object):
             return revcomp(self.string)
 
     def transcribe(self):
-        trans = {
-            'A': 'U',
-            'T': 'A',
-            'G': 'C',
-            'C': 'G',
-            'N': 'N'
-        }
-        transcript = []
-        for l in self.string:
-            l = l.upper()
-            try:
-                transcript.append(trans[l])
-            except KeyError:
-                if l in IUPAC_DEGENERATES:
-                    print(f"WARNING: Degenerate base designation '{l}' converted to 'N'")
-                    transcript.append("N")
-                else:
-                    raise IOError(f"Sequence string contains illegal character: '{l}'")
+        as_str = isinstance(self.string, str)
+        data = self.string.encode() if as_str else bytes(self.string)
 
+        illegal = data.translate(None, VALID_BASES)
+        if illegal:
+            raise IOError(f"Sequence string contains illegal character: '{chr(illegal[0]).upper()}'")
 
-        return ''.join(transcript)
+        degenerate = data.translate(None, NONDEGENERATE_BASES)
+        for d in sorted(set(degenerate)):
+            print(f"WARNING: Degenerate base designation '{chr(d).upper()}' converted to 'N'")
+
+        out = data.translate(TRANSCRIBE_TABLE)
+
+        return out.decode() if as_str else out
 
 class AASequenceCollection(object):
 
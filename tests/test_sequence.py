@@ -0,0 +1,36 @@
+import pytest
+from scgid.sequence import MappedFasta
+
+
+def test_fetch_matches_get_with_interior_blank_line(tmp_path):
+	# 60bp / blank / 60bp / 37bp - the blank line shifts the byte offset
+	# of every later line, so fetch() must stop trusting offset
+	# arithmetic for this record
+	lines = [
+		"A" * 20 + "C" * 20 + "G" * 20,
+		"",
+		"T" * 30 + "A" * 30,
+		"ACGTACGTAC" * 3 + "ACGTACG",
+	]
+	seq = "".join(lines).encode()
+
+	fasta = tmp_path / "blank_interior.fasta"
+	fasta.write_text(">NODE_1_length_157_cov_1.0\n" + "\n".join(lines) + "\n")
+
+	mapped = MappedFasta(str(fasta))
+	full = mapped.get("NODE_1")
+
+	assert full == seq
+	for start in range(0, len(seq), 7):
+		for end in (start + 1, start + 33, len(seq)):
+			assert mapped.fetch("NODE_1", start, end) == full[start:end]
+
+
+def test_empty_fasta_yields_empty_index(tmp_path):
+	fasta = tmp_path / "empty.fasta"
+	fasta.write_text("")
+
+	mapped = MappedFasta(str(fasta))
+
+	assert len(mapped.index) == 0
+	assert "NODE_1" not in mapped